@@ -2,7 +2,6 @@ import os, sys
 from typing import Optional, Literal
 from fastapi import FastAPI
 from pydantic import BaseModel, Field
-import pandas as pd
 
 # Ensure local imports work when running from different CWDs
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -11,6 +10,9 @@ if CURRENT_DIR not in sys.path:
 
 import decision_engine as de  # our previously generated rules engine
 
+# Compile the nested config once instead of on every request
+ENGINE_CONFIG = de.compile_config(de.DEFAULT_CONFIG)
+
 app = FastAPI(title="CNP Decision Service", version="1.0.0", description="Rules-based decisioning for card-not-present transactions")
 
 # --- Request schema ---
@@ -52,9 +54,8 @@ def get_config():
 
 @app.post("/transaction", response_model=DecisionResponse)
 def evaluate_transaction(txn: Transaction):
-    # Convert the validated model to a pandas Series and score with our engine
-    row = pd.Series(txn.model_dump())
-    res = de.assess_row(row, de.DEFAULT_CONFIG)
+    # Score the validated model as a plain dict (no pandas Series per request)
+    res = de.assess_row(txn.model_dump(), ENGINE_CONFIG)
     return {
         "transaction_id": txn.transaction_id,
         "decision": res["decision"],
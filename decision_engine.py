@@ -1,6 +1,27 @@
 import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import reduce
+from itertools import repeat
+import numpy as np
 import pandas as pd
-from typing import Dict, Any, List
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.api.types import CategoricalDtype
+from typing import Dict, Any, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+try:  # numba es opcional: si está instalado compila el kernel de score_frame
+    from numba import njit, prange
+except ImportError:  # pragma: no cover
+    njit = None
+    prange = range
+
+try:  # polars es opcional: habilita run_polars / assess_lazy
+    import polars as pl
+except ImportError:  # pragma: no cover
+    pl = None
 
 # ==========================
 #  CONSTANTES DE DECISIÓN
@@ -8,6 +29,8 @@ from typing import Dict, Any, List
 DECISION_ACCEPTED = "ACCEPTED"
 DECISION_IN_REVIEW = "IN_REVIEW"
 DECISION_REJECTED = "REJECTED"
+# Decisiones en orden de severidad; el índice es el código de decisión (0/1/2)
+DECISION_LABELS = np.array([DECISION_ACCEPTED, DECISION_IN_REVIEW, DECISION_REJECTED], dtype=object)
 
 # ==========================
 #  CONFIGURACIÓN BASE
@@ -38,16 +61,142 @@ DEFAULT_CONFIG = {
 # =======================================
 #  OVERRIDE CONFIG (CI/CD / ENVIRONMENT)
 # =======================================
-try:
-    import os as _os
-    _rej = _os.getenv("REJECT_AT")
-    _rev = _os.getenv("REVIEW_AT")
-    if _rej is not None:  # pragma: no cover
-        DEFAULT_CONFIG["score_to_decision"]["reject_at"] = int(_rej)
-    if _rev is not None:  # pragma: no cover
-        DEFAULT_CONFIG["score_to_decision"]["review_at"] = int(_rev)
-except Exception:  # pragma: no cover
-    pass
+def _apply_env_overrides(cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """Aplica REJECT_AT / REVIEW_AT del entorno sobre ``cfg`` (en sitio).
+
+    Un valor no entero lanza ``ValueError`` en lugar de ignorarse en silencio.
+    """
+    for key, env in (("reject_at", "REJECT_AT"), ("review_at", "REVIEW_AT")):
+        value = os.environ.get(env)
+        if value:
+            cfg["score_to_decision"][key] = int(value)
+    return cfg
+
+
+_apply_env_overrides(DEFAULT_CONFIG)
+
+
+# Campos categóricos cuyo valor suma directamente un peso al score
+WEIGHTED_FIELDS = ["ip_risk", "email_risk", "device_fingerprint_risk", "user_reputation"]
+
+# Normalización de texto por columna; se aplica una vez, sobre las categorías
+NORMALIZED_FIELDS = {
+    "ip_risk": str.lower,
+    "email_risk": str.lower,
+    "device_fingerprint_risk": str.lower,
+    "user_reputation": str.lower,
+    "product_type": str.lower,
+    "bin_country": str.upper,
+    "ip_country": str.upper,
+}
+
+# Valores que asume la evaluación cuando falta una columna (los mismos que assess_row)
+FIELD_DEFAULTS = {
+    "amount_mxn": 0.0,
+    "customer_txn_30d": 0,
+    "chargeback_count": 0,
+    "hour": 12,
+    "product_type": "_default",
+    "latency_ms": 0,
+    "user_reputation": "new",
+    "device_fingerprint_risk": "low",
+    "ip_risk": "low",
+    "email_risk": "low",
+    "bin_country": "",
+    "ip_country": "",
+}
+
+# Texto con el que se compara un país vacío (NaN/None): el original leía la celda
+# en blanco del CSV como NaN y str(nan).upper() da "NAN", así que un país vacío
+# frente a uno presente cuenta como geo_mismatch. La cadena "" (columna ausente)
+# sí desactiva la regla.
+NULL_COUNTRY = "NAN"
+
+# Formatos de salida admitidos por run / run_chunked
+OUTPUT_FORMATS = ("csv", "parquet")
+
+# Motores de evaluación en lote para la CLI
+ENGINES = ("pandas", "polars")
+
+# Tipo de risk_score en la salida, el mismo en todas las rutas (internamente el
+# score puede acumularse en int8/int16, ver ``_score_dtype``)
+RISK_SCORE_DTYPE = "int64"
+
+# Tipos de las columnas del CSV de entrada (evita la inferencia y reduce memoria).
+# Los enteros se leen en int64: los lectores convierten a un ancho menor sin
+# comprobar el rango y un valor grande daría la vuelta (3000000000 -> negativo).
+# transaction_id no se fija: puede venir en blanco y sólo se copia a la salida.
+SCHEMA = {
+    "amount_mxn": "float64",
+    "customer_txn_30d": "int64",
+    "geo_state": "category",
+    "device_type": "category",
+    "chargeback_count": "int64",
+    "hour": "int64",
+    "product_type": "category",
+    "latency_ms": "int64",
+    "user_reputation": "category",
+    "device_fingerprint_risk": "category",
+    "ip_risk": "category",
+    "email_risk": "category",
+    "bin_country": "category",
+    "ip_country": "category",
+}
+
+# Ancho al que se reducen los enteros de SCHEMA tras leerlos, sólo si todos los
+# valores del bloque caben (ver ``_narrow_integers``)
+NARROW_DTYPES = {
+    "customer_txn_30d": "int16",
+    "chargeback_count": "int16",
+    "latency_ms": "int32",
+    "hour": "int8",
+}
+
+# Equivalentes Polars de los tipos de SCHEMA (las categorías se leen como texto)
+_POLARS_TYPES = {
+    "int8": pl.Int8, "int16": pl.Int16, "int32": pl.Int32, "int64": pl.Int64,
+    "float64": pl.Float64, "category": pl.Utf8,
+} if pl is not None else {}
+
+
+# ==========================
+#  CONFIGURACIÓN COMPILADA
+# ==========================
+@dataclass(frozen=True, slots=True)
+class CompiledConfig:
+    """Configuración aplanada para la ruta fila a fila (sin diccionarios anidados)."""
+
+    categorical: Tuple[Tuple[str, Dict[str, int]], ...]
+    user_reputation: Dict[str, int]
+    night_hour: int
+    geo_mismatch: int
+    high_amount: int
+    new_user_high_amount: int
+    latency_extreme: int
+    amount_thresholds: Dict[str, Any]
+    latency_ms_extreme: int
+    chargeback_hard_block: int
+    reject_at: int
+    review_at: int
+
+
+def compile_config(cfg: Dict[str, Any]) -> CompiledConfig:
+    """Resuelve una sola vez las búsquedas anidadas de ``cfg``."""
+    weights = cfg["score_weights"]
+    return CompiledConfig(
+        categorical=tuple((f, weights[f]) for f in ["ip_risk", "email_risk", "device_fingerprint_risk"]),
+        user_reputation=weights["user_reputation"],
+        night_hour=weights["night_hour"],
+        geo_mismatch=weights["geo_mismatch"],
+        high_amount=weights["high_amount"],
+        new_user_high_amount=weights["new_user_high_amount"],
+        latency_extreme=weights["latency_extreme"],
+        amount_thresholds=cfg["amount_thresholds"],
+        latency_ms_extreme=cfg["latency_ms_extreme"],
+        chargeback_hard_block=cfg["chargeback_hard_block"],
+        reject_at=cfg["score_to_decision"]["reject_at"],
+        review_at=cfg["score_to_decision"]["review_at"],
+    )
 
 
 # ==========================
@@ -67,11 +216,24 @@ def high_amount(amount: float, product_type: str, thresholds: Dict[str, Any]) ->
 # ==========================
 #  FUNCIÓN PRINCIPAL
 # ==========================
-def assess_row(row: pd.Series, cfg: Dict[str, Any]) -> Dict[str, Any]:
-    """Evalúa una transacción individual y devuelve su decisión y puntuación de riesgo."""
+def assess_row(row: Mapping[str, Any], cfg: Union[Dict[str, Any], CompiledConfig]) -> Dict[str, Any]:
+    """Evalúa una transacción individual y devuelve su decisión y puntuación de riesgo.
+
+    ``row`` puede ser una ``pd.Series`` o un ``dict``; los campos ausentes toman su
+    valor de ``FIELD_DEFAULTS``. ``cfg`` puede ser el diccionario de configuración o
+    un ``CompiledConfig``; para evaluar muchas filas conviene compilarlo una vez con
+    ``compile_config``.
+    """
+    return assess_at({c: (row.get(c, d),) for c, d in FIELD_DEFAULTS.items()}, 0, cfg)
+
+
+def assess_at(cols: Mapping[str, Sequence], i: int, cfg: Union[Dict[str, Any], CompiledConfig]) -> Dict[str, Any]:
+    """Evalúa la fila ``i`` de ``cols`` (ver ``column_arrays``) por posición, sin ``Series.get``."""
+    if not isinstance(cfg, CompiledConfig):
+        cfg = compile_config(cfg)
     score = 0
     reasons: List[str] = []
-    rep = str(row.get("user_reputation", "new")).lower()
+    rep = str(cols["user_reputation"][i]).lower()
 
     # --- Función auxiliar ---
     def add_if(cond: bool, reason: str, add: int = 0):
@@ -81,21 +243,21 @@ def assess_row(row: pd.Series, cfg: Dict[str, Any]) -> Dict[str, Any]:
             reasons.append(f"{reason}(+{add})" if add else reason)
 
     # --- 1. Hard block ---
-    if _is_hard_block(row, cfg):
+    if _is_hard_block(cols, i, cfg):
         return _reject_hard()
 
     # --- 2. Riesgos categóricos ---
-    score, reasons = _categorical_risks(row, cfg, score, reasons)
+    score, reasons = _categorical_risks(cols, i, cfg, score, reasons)
 
     # --- 3. Reputación ---
-    rep_add = cfg["score_weights"]["user_reputation"].get(rep, 0)
+    rep_add = cfg.user_reputation.get(rep, 0)
     add_if(rep_add != 0, f"user_reputation:{rep}", rep_add)
 
     # --- 4. Riesgos contextuales ---
-    score, reasons = _apply_contextual_risks(row, cfg, score, reasons, rep)
+    score, reasons = _apply_contextual_risks(cols, i, cfg, score, reasons, rep)
 
     # --- 5. Buffer por frecuencia ---
-    score, reasons = _apply_frequency_buffer(row, score, reasons, rep)
+    score, reasons = _apply_frequency_buffer(cols, i, score, reasons, rep)
 
     # --- 6. Decisión final ---
     decision = _get_decision(score, cfg)
@@ -106,11 +268,11 @@ def assess_row(row: pd.Series, cfg: Dict[str, Any]) -> Dict[str, Any]:
 # ==========================
 #  FUNCIONES DE APOYO
 # ==========================
-def _is_hard_block(row, cfg) -> bool:
+def _is_hard_block(cols, i, cfg) -> bool:
     """Determina si aplica bloqueo directo (chargebacks + IP alto)."""
     return (
-        int(row.get("chargeback_count", 0)) >= cfg["chargeback_hard_block"]
-        and str(row.get("ip_risk", "low")).lower() == "high"
+        int(cols["chargeback_count"][i]) >= cfg.chargeback_hard_block
+        and str(cols["ip_risk"][i]).lower() == "high"
     )
 
 
@@ -123,54 +285,59 @@ def _reject_hard() -> Dict[str, Any]:
     }
 
 
-def _categorical_risks(row, cfg, score, reasons):
+def _categorical_risks(cols, i, cfg, score, reasons):
     """Procesa ip_risk, email_risk y device_fingerprint_risk."""
-    for field in ["ip_risk", "email_risk", "device_fingerprint_risk"]:
-        val = str(row.get(field, "low")).lower()
-        add = cfg["score_weights"][field].get(val, 0)
+    for field, table in cfg.categorical:
+        val = str(cols[field][i]).lower()
+        add = table.get(val, 0)
         if add:
             score += add
             reasons.append(f"{field}:{val}(+{add})")
     return score, reasons
 
 
-def _apply_contextual_risks(row, cfg, score, reasons, rep):
+def _apply_contextual_risks(cols, i, cfg, score, reasons, rep):
     """Evalúa noche, geografía, monto y latencia."""
-    hr = int(row.get("hour", 12))
+    hr = int(cols["hour"][i])
     if is_night(hr):
-        add = cfg["score_weights"]["night_hour"]
+        add = cfg.night_hour
         score += add
         reasons.append(f"night_hour:{hr}(+{add})")
 
-    bin_c, ip_c = str(row.get("bin_country", "")).upper(), str(row.get("ip_country", "")).upper()
+    bin_c, ip_c = _country(cols["bin_country"][i]), _country(cols["ip_country"][i])
     if bin_c and ip_c and bin_c != ip_c:
-        add = cfg["score_weights"]["geo_mismatch"]
+        add = cfg.geo_mismatch
         score += add
         reasons.append(f"geo_mismatch:{bin_c}!={ip_c}(+{add})")
 
-    amount = float(row.get("amount_mxn", 0.0))
-    ptype = str(row.get("product_type", "_default")).lower()
-    if high_amount(amount, ptype, cfg["amount_thresholds"]):
-        add = cfg["score_weights"]["high_amount"]
+    amount = float(cols["amount_mxn"][i])
+    ptype = str(cols["product_type"][i]).lower()
+    if high_amount(amount, ptype, cfg.amount_thresholds):
+        add = cfg.high_amount
         score += add
         reasons.append(f"high_amount:{ptype}:{amount}(+{add})")
         if rep == "new":
-            add2 = cfg["score_weights"]["new_user_high_amount"]
+            add2 = cfg.new_user_high_amount
             score += add2
             reasons.append(f"new_user_high_amount(+{add2})")
 
-    lat = int(row.get("latency_ms", 0))
-    if lat >= cfg["latency_ms_extreme"]:
-        add = cfg["score_weights"]["latency_extreme"]
+    lat = int(cols["latency_ms"][i])
+    if lat >= cfg.latency_ms_extreme:
+        add = cfg.latency_extreme
         score += add
         reasons.append(f"latency_extreme:{lat}ms(+{add})")
 
     return score, reasons
 
 
-def _apply_frequency_buffer(row, score, reasons, rep):
+def _country(value) -> str:
+    """País en mayúsculas; vacío (NaN/None) como ``NULL_COUNTRY``."""
+    return NULL_COUNTRY if pd.isna(value) else str(value).upper()
+
+
+def _apply_frequency_buffer(cols, i, score, reasons, rep):
     """Aplica bonificación por frecuencia de cliente."""
-    freq = int(row.get("customer_txn_30d", 0))
+    freq = int(cols["customer_txn_30d"][i])
     if rep in ("recurrent", "trusted") and freq >= 3 and score > 0:
         score -= 1
         reasons.append("frequency_buffer(-1)")
@@ -179,32 +346,689 @@ def _apply_frequency_buffer(row, score, reasons, rep):
 
 def _get_decision(score, cfg) -> str:
     """Mapea score a decisión final."""
-    reject_at = cfg["score_to_decision"]["reject_at"]
-    review_at = cfg["score_to_decision"]["review_at"]
-    if score >= reject_at:
+    if score >= cfg.reject_at:
         return DECISION_REJECTED
-    if score >= review_at:
+    if score >= cfg.review_at:
         return DECISION_IN_REVIEW
     return DECISION_ACCEPTED
 
 
+# ==========================
+#  EVALUACIÓN VECTORIZADA
+# ==========================
+def assess_frame(df: pd.DataFrame, cfg: Dict[str, Any]) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """Evalúa todas las transacciones de un DataFrame con operaciones por columna.
+
+    Aplica las mismas reglas que ``assess_row`` y devuelve tres Series alineadas
+    con ``df.index``: decisión, puntuación de riesgo y razones. Las columnas que
+    falten toman los valores por defecto de ``FIELD_DEFAULTS``.
+    """
+    df = _prepare(df)
+    score_dtype = _score_dtype(cfg)
+
+    # --- Hard block: se resuelve primero y esas filas no pasan por las reglas ---
+    codes, cats = _category_codes(df["ip_risk"])
+    hard = (df["chargeback_count"].to_numpy() >= cfg["chargeback_hard_block"]) & _gather(codes, cats == "high", False)
+    if hard.any():
+        blocked = _reject_hard()
+        decision = np.full(len(df), blocked["decision"], dtype=object)
+        score = np.full(len(df), blocked["risk_score"], dtype=score_dtype)
+        reasons = np.full(len(df), blocked["reasons"], dtype=object)
+        keep = ~hard
+        decision[keep], score[keep], reasons[keep] = _score_rules(df[keep], cfg, score_dtype)
+    else:
+        decision, score, reasons = _score_rules(df, cfg, score_dtype)
+
+    return (
+        pd.Series(decision, index=df.index),
+        pd.Series(score, index=df.index),
+        pd.Series(reasons, index=df.index, dtype=object),
+    )
+
+
+def _score_rules(df: pd.DataFrame, cfg: Dict[str, Any], score_dtype: np.dtype) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Aplica las reglas de score a filas ya preparadas y sin hard block."""
+    weights = cfg["score_weights"]
+    score = np.zeros(len(df), dtype=score_dtype)
+    parts: List[np.ndarray] = []
+
+    # --- 1. Riesgos categóricos y reputación ---
+    for field in WEIGHTED_FIELDS:
+        codes, cats = _category_codes(df[field])
+        cat_add = _category_values(cats, weights[field], 0).astype(score_dtype)
+        add = _gather(codes, cat_add, score_dtype.type(0))
+        score += add
+        parts.append(_reason(add != 0, _gather(codes, [f"{field}:{c}(+{w})" for c, w in zip(cats, cat_add)], "")))
+    codes, cats = _category_codes(df["user_reputation"])
+    rep_new = _gather(codes, cats == "new", False)
+    rep_loyal = _gather(codes, cats.isin(["recurrent", "trusted"]), False)
+
+    # --- 2. Riesgos contextuales ---
+    # Las razones con valores (hora, países, monto, latencia) se formatean una
+    # vez por valor distinto de las filas que disparan la regla, no por fila.
+    h = df["hour"].to_numpy()  # int8 desde read_transactions si cabe: comparaciones de 1 byte por fila
+    night = (h >= 22) | (h <= 5)
+    add = weights["night_hour"]
+    score += night.astype(score_dtype) * add
+    parts.append(_format_masked(night, h, lambda v, add=add: f"night_hour:{v}(+{add})"))
+
+    geo, pairs, countries = _geo_mismatch(df)
+    add = weights["geo_mismatch"]
+    n_countries = len(countries)
+    score += geo.astype(score_dtype) * add
+    parts.append(_format_masked(
+        geo, pairs,
+        lambda k, add=add: f"geo_mismatch:{countries[k // n_countries]}!={countries[k % n_countries]}(+{add})",
+    ))
+
+    amount = df["amount_mxn"].to_numpy(dtype=np.float64)
+    ptype_codes, ptype_cats = _category_codes(df["product_type"])
+    high = amount >= _threshold_table(ptype_cats, cfg["amount_thresholds"])[ptype_codes]
+    add = weights["high_amount"]
+    score += high.astype(score_dtype) * add
+    prefix = _gather(ptype_codes, [f"high_amount:{c}:" for c in ptype_cats], "high_amount:nan:")
+    amount_txt = _format_masked(high, amount, lambda v, add=add: f"{float(v)}(+{add})")
+    amount_txt[high] = prefix[high] + amount_txt[high]
+    parts.append(amount_txt)
+
+    new_high = high & rep_new
+    add = weights["new_user_high_amount"]
+    score += new_high.astype(score_dtype) * add
+    parts.append(_reason(new_high, f"new_user_high_amount(+{add})"))
+
+    lat = df["latency_ms"].to_numpy()
+    lat_ext = lat >= cfg["latency_ms_extreme"]
+    add = weights["latency_extreme"]
+    score += lat_ext.astype(score_dtype) * add
+    parts.append(_format_masked(lat_ext, lat, lambda v, add=add: f"latency_extreme:{v}ms(+{add})"))
+
+    # --- 3. Buffer por frecuencia ---
+    buffer = rep_loyal & (df["customer_txn_30d"].to_numpy() >= 3) & (score > 0)
+    score -= buffer.astype(score_dtype)
+    parts.append(_reason(buffer, "frequency_buffer(-1)"))
+
+    # --- 4. Decisión final ---
+    return _decide(score, cfg), score, _join_reasons(parts)
+
+
+def _score_dtype(cfg: Dict[str, Any]) -> np.dtype:
+    """``int8`` si el score (y el 100 del hard block) cabe en un byte con estos pesos; si no ``int16``."""
+    weights = cfg["score_weights"]
+    tables = [list(weights[f].values()) or [0] for f in WEIGHTED_FIELDS]
+    flat = [weights[k] for k in ("night_hour", "geo_mismatch", "high_amount", "new_user_high_amount", "latency_extreme")]
+    hi = sum(max(max(t), 0) for t in tables) + sum(max(w, 0) for w in flat)
+    lo = sum(min(min(t), 0) for t in tables) + sum(min(w, 0) for w in flat) - 1
+    info = np.iinfo(np.int8)
+    fits = info.min <= lo and max(hi, _reject_hard()["risk_score"]) <= info.max
+    return np.dtype(np.int8 if fits else np.int16)
+
+
+def column_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Extrae una sola vez los arrays de las columnas que lee ``assess_at``."""
+    df = _with_defaults(df)
+    return {c: df[c].to_numpy() for c in FIELD_DEFAULTS}
+
+
+def _with_defaults(df: pd.DataFrame) -> pd.DataFrame:
+    """Añade (sin modificar ``df``) las columnas ausentes con su valor por defecto."""
+    missing = {c: v for c, v in FIELD_DEFAULTS.items() if c not in df.columns}
+    return df.assign(**missing) if missing else df
+
+
+def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+    """Completa las columnas ausentes y normaliza las de texto sin modificar ``df``.
+
+    Un DataFrame que ya viene de ``read_transactions`` se devuelve tal cual.
+    """
+    df = _with_defaults(df)
+    changed = _normalized_columns(df)
+    return df.assign(**changed) if changed else df
+
+
+def _normalized_columns(df: pd.DataFrame) -> Dict[str, pd.Series]:
+    """Columnas de ``NORMALIZED_FIELDS`` que cambian al normalizarlas."""
+    changed = {}
+    for col, func in NORMALIZED_FIELDS.items():
+        if col in df.columns:
+            new = _map_categories(df[col], func)
+            if new is not None:
+                changed[col] = new
+    return changed
+
+
+def _map_categories(col: pd.Series, func) -> Optional[pd.Series]:
+    """Aplica ``func`` a las categorías de ``col`` (no a cada celda).
+
+    Devuelve None si ``col`` ya es categórica y no cambia. Si dos categorías
+    colapsan en una (p. ej. "High" y "high") se recodifican las filas.
+    """
+    is_cat = isinstance(col.dtype, CategoricalDtype)
+    if not is_cat:
+        col = col.astype("category")
+    cats = col.cat.categories
+    new = cats.astype(str).map(func)
+    if is_cat and new.equals(cats):
+        return None
+    if new.is_unique:
+        return col.cat.rename_categories(new)
+    unique = new.unique()
+    remap = unique.get_indexer(new)
+    codes = col.cat.codes.to_numpy()
+    new_codes = np.where(codes >= 0, remap[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(new_codes, unique), index=col.index, name=col.name)
+
+
+def _geo_mismatch(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, pd.Index]:
+    """Máscara de discrepancia entre los países de BIN e IP (ya en mayúsculas).
+
+    Compara códigos de categoría, no cadenas: ambas columnas se recodifican
+    sobre la unión de sus categorías, en la que NaN es ``NULL_COUNTRY`` (como en
+    ``_country``). Devuelve además una clave entera por pareja (BIN, IP) y esa
+    unión, para formatear cada pareja una sola vez.
+    """
+    bin_codes, bin_cats = _category_codes(df["bin_country"])
+    ip_codes, ip_cats = _category_codes(df["ip_country"])
+    countries = bin_cats.astype(str).union(ip_cats.astype(str)).union([NULL_COUNTRY])
+    null = countries.get_loc(NULL_COUNTRY)
+    b = _gather(bin_codes, countries.get_indexer(bin_cats.astype(str)), null)
+    i = _gather(ip_codes, countries.get_indexer(ip_cats.astype(str)), null)
+    blank = countries == ""
+    geo = ~blank[b] & ~blank[i] & (b != i)
+    return geo, b.astype(np.int64) * len(countries) + i, countries
+
+
+def _category_codes(col: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """Devuelve los códigos enteros de ``col`` (categórica y normalizada, ver ``_prepare``) y sus categorías."""
+    return col.cat.codes.to_numpy(), col.cat.categories
+
+
+def _category_values(cats: pd.Index, table: Dict[str, Any], default) -> np.ndarray:
+    """Valor de ``table`` para cada categoría (``default`` si no está), con ``Index.map``."""
+    return cats.map(table).fillna(default).to_numpy()
+
+
+def _threshold_table(cats: pd.Index, thresholds: Dict[str, Any]) -> np.ndarray:
+    """Umbral de monto por código de product_type; la última posición (código -1) es ``_default``."""
+    default = thresholds["_default"]
+    return np.append(_category_values(cats, thresholds, default), default).astype(np.float64)
+
+
+def _gather(codes: np.ndarray, values, fill) -> np.ndarray:
+    """Indexa ``values`` (uno por categoría) con los códigos de cada fila.
+
+    ``fill`` se añade al final para que el código -1 (NaN) apunte a él.
+    """
+    table = np.asarray(values, dtype=object) if isinstance(fill, str) else np.asarray(values)
+    return np.append(table, fill)[codes]
+
+
+def _decide(score: np.ndarray, cfg: Dict[str, Any]) -> np.ndarray:
+    """Mapea cada score a su decisión con una sola búsqueda sobre los cortes.
+
+    Si review_at > reject_at la revisión nunca aplica (como en ``_get_decision``),
+    por eso el primer corte se acota a reject_at y los cortes quedan ordenados.
+    """
+    reject_at = cfg["score_to_decision"]["reject_at"]
+    review_at = min(cfg["score_to_decision"]["review_at"], reject_at)
+    cutoffs = np.array([review_at, reject_at])
+    return DECISION_LABELS[np.searchsorted(cutoffs, score, side="right")]
+
+
+def _reason(mask: pd.Series, text) -> np.ndarray:
+    """Devuelve el texto de la razón donde aplica la regla y cadena vacía en el resto."""
+    return np.where(np.asarray(mask), np.asarray(text, dtype=object), "")
+
+
+def _format_masked(mask: np.ndarray, values: np.ndarray, fmt) -> np.ndarray:
+    """Texto de ``fmt(valor)`` donde aplica ``mask`` y cadena vacía en el resto.
+
+    ``fmt`` se llama una vez por valor distinto (``pd.factorize``) y solo
+    sobre las filas marcadas; el resultado se reparte con los códigos.
+    """
+    out = np.full(len(mask), "", dtype=object)
+    if mask.any():
+        codes, uniques = pd.factorize(values[mask])
+        out[mask] = np.array([fmt(u) for u in uniques] + [""], dtype=object)[codes]
+    return out
+
+
+def _join_reasons(parts: List[np.ndarray]) -> np.ndarray:
+    """Une columna a columna las razones no vacías con ';'."""
+    return reduce(lambda a, b: np.where((a != "") & (b != ""), a + ";" + b, a + b), parts)
+
+
+# ==========================
+#  KERNEL COMPILADO (NUMBA)
+# ==========================
+def _score_kernel(codes, weights, ip_codes, ip_high, rep_codes, rep_new, rep_loyal, ptype, thresholds,
+                  hour, geo, amount, latency, chargebacks, freq, params):
+    """Calcula código de decisión (0/1/2) y score por fila sobre arrays planos.
+
+    ``codes`` tiene una fila por campo de ``WEIGHTED_FIELDS`` y ``weights`` el peso
+    de cada categoría; ``ip_high``, ``rep_new`` y ``rep_loyal`` se indexan con los
+    códigos de ip_risk y user_reputation. Las tablas por categoría terminan en una
+    posición de relleno a la que apunta el código -1.
+    """
+    night_w, geo_w, high_w, new_high_w, lat_w, lat_extreme, hard_block, reject_at, review_at = params
+    n = hour.shape[0]
+    decision = np.empty(n, dtype=np.int8)
+    score = np.empty(n, dtype=np.int16)
+    for i in prange(n):
+        if chargebacks[i] >= hard_block and ip_high[ip_codes[i]]:
+            decision[i] = 2
+            score[i] = 100
+            continue
+        s = 0
+        for f in range(codes.shape[0]):
+            s += weights[f, codes[f, i]]
+        if hour[i] >= 22 or hour[i] <= 5:
+            s += night_w
+        if geo[i]:
+            s += geo_w
+        if amount[i] >= thresholds[ptype[i]]:
+            s += high_w
+            if rep_new[rep_codes[i]]:
+                s += new_high_w
+        if latency[i] >= lat_extreme:
+            s += lat_w
+        if rep_loyal[rep_codes[i]] and freq[i] >= 3 and s > 0:
+            s -= 1
+        score[i] = s
+        if s >= reject_at:
+            decision[i] = 2
+        elif s >= review_at:
+            decision[i] = 1
+        else:
+            decision[i] = 0
+    return decision, score
+
+
+_score_kernel_jit = njit(parallel=True, cache=True)(_score_kernel) if njit else None
+
+
+def score_frame(df: pd.DataFrame, cfg: Dict[str, Any]) -> Tuple[pd.Series, pd.Series]:
+    """Devuelve sólo decisión y score (sin razones) para todas las filas de ``df``.
+
+    Usa el kernel compilado con numba cuando está disponible y, si no, ``assess_frame``.
+    """
+    if _score_kernel_jit is None:  # pragma: no cover
+        decision, score, _ = assess_frame(df, cfg)
+        return decision, score
+
+    df = _prepare(df)
+    weights = cfg["score_weights"]
+    field_codes, tables = [], []
+    for field in WEIGHTED_FIELDS:
+        codes, cats = _category_codes(df[field])
+        field_codes.append(codes.astype(np.int64))
+        tables.append(_category_values(cats, weights[field], 0))
+    width = max(len(t) for t in tables) + 1
+    weight_arr = np.zeros((len(tables), width), dtype=np.int64)
+    for f, t in enumerate(tables):
+        weight_arr[f, :len(t)] = t
+
+    ip_codes, ip_cats = _category_codes(df["ip_risk"])
+    rep_codes, rep_cats = _category_codes(df["user_reputation"])
+    ptype_codes, ptype_cats = _category_codes(df["product_type"])
+    threshold_arr = _threshold_table(ptype_cats, cfg["amount_thresholds"])
+    params = np.array([
+        weights["night_hour"], weights["geo_mismatch"], weights["high_amount"],
+        weights["new_user_high_amount"], weights["latency_extreme"], cfg["latency_ms_extreme"],
+        cfg["chargeback_hard_block"], cfg["score_to_decision"]["reject_at"],
+        cfg["score_to_decision"]["review_at"],
+    ], dtype=np.int64)
+
+    decision, score = _score_kernel_jit(
+        np.stack(field_codes),
+        weight_arr,
+        ip_codes.astype(np.int64),
+        np.append(ip_cats == "high", False),
+        rep_codes.astype(np.int64),
+        np.append(rep_cats == "new", False),
+        np.append(rep_cats.isin(["recurrent", "trusted"]), False),
+        ptype_codes.astype(np.int64),
+        threshold_arr,
+        df["hour"].to_numpy(dtype=np.int64),
+        _geo_mismatch(df)[0],
+        df["amount_mxn"].to_numpy(dtype=np.float64),
+        df["latency_ms"].to_numpy(dtype=np.int64),
+        df["chargeback_count"].to_numpy(dtype=np.int64),
+        df["customer_txn_30d"].to_numpy(dtype=np.int64),
+        params,
+    )
+    return pd.Series(DECISION_LABELS[decision], index=df.index), pd.Series(score, index=df.index)
+
+
+# ==========================
+#  RUTA POLARS (LAZY)
+# ==========================
+def assess_lazy(lf: "pl.LazyFrame", cfg: Dict[str, Any]) -> "pl.LazyFrame":
+    """Versión Polars de ``assess_frame``: añade decision, risk_score y reasons al plan.
+
+    Cada regla es una expresión de columna; Polars las fusiona y las ejecuta en
+    paralelo al hacer ``collect``/``sink_*``. Normaliza las columnas de texto y
+    completa las ausentes igual que la ruta pandas.
+    """
+    weights = cfg["score_weights"]
+    names = lf.collect_schema().names()
+    missing = [pl.lit(v).alias(c) for c, v in FIELD_DEFAULTS.items() if c not in names]
+    if missing:
+        lf = lf.with_columns(missing)
+    lf = lf.with_columns([
+        getattr(pl.col(c).cast(pl.Utf8).str, "to_lowercase" if func is str.lower else "to_uppercase")()
+        for c, func in NORMALIZED_FIELDS.items()
+    ])
+
+    terms, parts = [], []
+    for field in WEIGHTED_FIELDS:
+        add = pl.col(field).replace_strict(weights[field], default=0, return_dtype=pl.Int16).fill_null(0)
+        terms.append(add)
+        parts.append(pl.when(add != 0).then(pl.format(field + ":{}(+{})", pl.col(field), add)))
+    rep = pl.col("user_reputation")
+    rep_new = (rep == "new").fill_null(False)
+    rep_loyal = rep.is_in(["recurrent", "trusted"]).fill_null(False)
+
+    def rule(mask, add, text):
+        terms.append(mask.cast(pl.Int16) * add)
+        parts.append(pl.when(mask).then(text))
+
+    hr = pl.col("hour")
+    add = weights["night_hour"]
+    rule((hr >= 22) | (hr <= 5), add, pl.format(f"night_hour:{{}}(+{add})", hr))
+
+    bin_c, ip_c = pl.col("bin_country").fill_null(NULL_COUNTRY), pl.col("ip_country").fill_null(NULL_COUNTRY)
+    geo = (bin_c != "") & (ip_c != "") & (bin_c != ip_c)
+    add = weights["geo_mismatch"]
+    rule(geo, add, pl.format(f"geo_mismatch:{{}}!={{}}(+{add})", bin_c, ip_c))
+
+    thresholds = cfg["amount_thresholds"]
+    default = thresholds["_default"]
+    ptype = pl.col("product_type")
+    amount = pl.col("amount_mxn").cast(pl.Float64)
+    threshold = ptype.replace_strict(thresholds, default=default, return_dtype=pl.Float64).fill_null(default)
+    high = amount >= threshold
+    add = weights["high_amount"]
+    rule(high, add, pl.format(f"high_amount:{{}}:{{}}(+{add})", ptype.fill_null("nan"), amount.cast(pl.Utf8)))
+    add = weights["new_user_high_amount"]
+    rule(high & rep_new, add, pl.lit(f"new_user_high_amount(+{add})"))
+
+    lat = pl.col("latency_ms")
+    add = weights["latency_extreme"]
+    rule(lat >= cfg["latency_ms_extreme"], add, pl.format(f"latency_extreme:{{}}ms(+{add})", lat))
+
+    pre = pl.sum_horizontal(terms).cast(pl.Int16)
+    buffer = rep_loyal & (pl.col("customer_txn_30d") >= 3) & (pre > 0)
+    parts.append(pl.when(buffer).then(pl.lit("frequency_buffer(-1)")))
+    score = pre - buffer.cast(pl.Int16)
+
+    score_to_decision = cfg["score_to_decision"]
+    decision = (
+        pl.when(score >= score_to_decision["reject_at"]).then(pl.lit(DECISION_REJECTED))
+        .when(score >= score_to_decision["review_at"]).then(pl.lit(DECISION_IN_REVIEW))
+        .otherwise(pl.lit(DECISION_ACCEPTED))
+    )
+    hard = ((pl.col("chargeback_count") >= cfg["chargeback_hard_block"]) & (pl.col("ip_risk") == "high")).fill_null(False)
+    blocked = _reject_hard()
+    return lf.with_columns(
+        pl.when(hard).then(pl.lit(blocked["decision"])).otherwise(decision).alias("decision"),
+        pl.when(hard).then(pl.lit(blocked["risk_score"])).otherwise(score)
+        .cast(_POLARS_TYPES[RISK_SCORE_DTYPE]).alias("risk_score"),
+        pl.when(hard).then(pl.lit(blocked["reasons"]))
+        .otherwise(pl.concat_str(parts, separator=";", ignore_nulls=True)).alias("reasons"),
+    )
+
+
+def run_polars(
+    input_csv: str,
+    output_csv: str,
+    config: Dict[str, Any] = None,
+    with_reasons: bool = True,
+    output_format: str = "csv",
+) -> None:
+    """Como ``run`` pero con Polars: lee, evalúa y escribe en streaming (fuera de memoria)."""
+    if pl is None:  # pragma: no cover
+        raise ImportError("run_polars requires polars (pip install polars)")
+    _check_format(output_format)
+    cfg = config or DEFAULT_CONFIG
+    header = pl.scan_csv(input_csv).collect_schema().names()
+    schema = {c: _POLARS_TYPES[t] for c, t in SCHEMA.items() if c in header}
+    lf = assess_lazy(pl.scan_csv(input_csv, schema_overrides=schema), cfg)
+    if not with_reasons:
+        lf = lf.drop("reasons")
+    if output_format == "parquet":
+        lf.sink_parquet(output_csv, compression="zstd")
+    else:
+        lf.sink_csv(output_csv)
+
+
 # ==========================
 #  PROCESAMIENTO EN LOTE
 # ==========================
-def run(input_csv: str, output_csv: str, config: Dict[str, Any] = None) -> pd.DataFrame:
-    """Ejecuta la evaluación de múltiples transacciones desde un CSV."""
+def read_transactions(input_csv: str) -> pd.DataFrame:
+    """Lee el CSV de transacciones con los tipos de ``SCHEMA``.
+
+    Usa el lector de pyarrow (multihilo). Las columnas que no están en ``SCHEMA``
+    se conservan con el tipo inferido para que lleguen intactas al archivo de salida.
+    """
+    return _normalize_read(pd.read_csv(input_csv, engine="pyarrow", dtype=SCHEMA))
+
+
+def iter_transactions(input_csv: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Como ``read_transactions`` pero en bloques de ``chunksize`` filas.
+
+    El lector de pyarrow no admite ``chunksize``, por eso se usa el lector de C.
+    """
+    for chunk in pd.read_csv(input_csv, dtype=SCHEMA, chunksize=chunksize):
+        yield _normalize_read(chunk)
+
+
+def _normalize_read(df: pd.DataFrame) -> pd.DataFrame:
+    """Deja en sitio un bloque recién leído listo para evaluar: categorías y enteros."""
+    return _narrow_integers(_normalize_categories(df))
+
+
+def _narrow_integers(df: pd.DataFrame) -> pd.DataFrame:
+    """Reduce en sitio las columnas de ``NARROW_DTYPES`` cuando su rango lo permite.
+
+    Una columna con algún valor fuera del rango del tipo estrecho se queda en
+    int64, de modo que ni las reglas ni el archivo de salida ven un valor truncado.
+    """
+    for col, dtype in NARROW_DTYPES.items():
+        if col in df.columns and len(df):
+            info = np.iinfo(dtype)
+            values = df[col].to_numpy()
+            if info.min <= values.min() and values.max() <= info.max:
+                df[col] = values.astype(dtype)
+    return df
+
+
+def _normalize_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """Normaliza en sitio las columnas ``category`` recién leídas.
+
+    Fuerza categorías de texto (una columna vacía o toda en blanco llega con
+    categorías numéricas) y aplica una sola vez ``NORMALIZED_FIELDS``, de modo que
+    la evaluación ya no repite ``lower()``/``upper()`` por celda.
+    """
+    for col, dtype in SCHEMA.items():
+        if dtype == "category" and col in df.columns and df[col].cat.categories.dtype != object:
+            df[col] = df[col].cat.rename_categories(df[col].cat.categories.astype(str))
+    for col, new in _normalized_columns(df).items():
+        df[col] = new
+    return df
+
+
+def assess_frame_parallel(
+    df: pd.DataFrame,
+    cfg: Dict[str, Any],
+    n_jobs: int = -1,
+    pool: Optional[ProcessPoolExecutor] = None,
+) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """Reparte ``df`` en ``n_jobs`` bloques contiguos y los evalúa con ``assess_frame`` en procesos.
+
+    ``n_jobs=-1`` usa todos los CPUs. Cada proceso recibe un bloque completo, no filas
+    sueltas, para que el coste de serialización quede amortizado. Si no se pasa
+    ``pool`` se crea uno (ver ``_process_pool``) sólo para esta llamada; quien evalúa
+    muchos bloques seguidos debe pasar el suyo para no pagar el arranque cada vez.
+    """
+    n_jobs = min(_resolve_jobs(n_jobs), max(len(df), 1))
+    if n_jobs == 1:
+        return assess_frame(df, cfg)
+    bounds = np.linspace(0, len(df), n_jobs + 1).astype(int)
+    chunks = [df.iloc[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+    own_pool = pool is None
+    if own_pool:
+        pool = _process_pool(n_jobs)
+    try:
+        results = list(pool.map(assess_frame, chunks, repeat(cfg)))
+    finally:
+        if own_pool:
+            pool.shutdown()
+    decision, score, reasons = (pd.concat(cols) for cols in zip(*results))
+    return decision, score, reasons
+
+
+def _resolve_jobs(n_jobs: int) -> int:
+    """Número de procesos para ``n_jobs``; un valor menor que 1 significa todos los CPUs."""
+    return n_jobs if n_jobs >= 1 else os.cpu_count() or 1
+
+
+def _process_pool(n_jobs: int) -> Optional[ProcessPoolExecutor]:
+    """Pool de ``n_jobs`` procesos para ``assess_frame_parallel``, o None si basta uno.
+
+    Los procesos se crean con "spawn": hacer fork después de que arranquen los
+    hilos de numba o pyarrow puede bloquear al proceso hijo. El precio es que cada
+    proceso vuelve a importar el módulo, por eso el pool se reutiliza entre bloques.
+    """
+    n_jobs = _resolve_jobs(n_jobs)
+    if n_jobs == 1:
+        return None
+    return ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn"))
+
+
+def run(
+    input_csv: str,
+    output_csv: str,
+    config: Dict[str, Any] = None,
+    n_jobs: int = 1,
+    with_reasons: bool = True,
+    output_format: str = "csv",
+) -> pd.DataFrame:
+    """Ejecuta la evaluación de múltiples transacciones desde un CSV.
+
+    Con ``n_jobs`` distinto de 1 la evaluación se reparte entre procesos. Con
+    ``with_reasons=False`` se omite la columna ``reasons`` y el score se calcula con
+    ``score_frame`` (kernel compilado, ya multihilo, por lo que ignora ``n_jobs``).
+    ``output_format`` es ``"csv"`` o ``"parquet"`` (zstd, conserva las categorías).
+    """
+    _check_format(output_format)
     cfg = config or DEFAULT_CONFIG
-    df = pd.read_csv(input_csv)
-    results = []
-    for _, row in df.iterrows():
-        res = assess_row(row, cfg)
-        results.append(res)
-    out = df.copy()
-    out["decision"] = [r["decision"] for r in results]
-    out["risk_score"] = [r["risk_score"] for r in results]
-    out["reasons"] = [r["reasons"] for r in results]
-    out.to_csv(output_csv, index=False)
-    return out
+    # df lo crea read_transactions y no se comparte: se amplía en sitio, sin copia
+    df = _score_into(read_transactions(input_csv), cfg, n_jobs, with_reasons)
+    if output_format == "parquet":
+        _write_parquet_chunks(iter([df]), output_csv)
+    else:
+        df.to_csv(output_csv, index=False)
+    return df
+
+
+def run_chunked(
+    input_csv: str,
+    output_csv: str,
+    config: Dict[str, Any] = None,
+    chunksize: int = 100_000,
+    n_jobs: int = 1,
+    with_reasons: bool = True,
+    output_format: str = "csv",
+) -> int:
+    """Como ``run`` pero leyendo, evaluando y escribiendo por bloques de ``chunksize`` filas.
+
+    La memoria queda acotada por el tamaño del bloque, no por el del CSV. En Parquet
+    cada bloque se escribe como un row group. Devuelve el número de transacciones
+    procesadas.
+    """
+    _check_format(output_format)
+    cfg = config or DEFAULT_CONFIG
+    # un solo pool para todos los bloques: arrancar procesos "spawn" cuesta segundos
+    pool = _process_pool(n_jobs) if with_reasons else None
+    try:
+        chunks = (_score_into(c, cfg, n_jobs, with_reasons, pool) for c in iter_transactions(input_csv, chunksize))
+        if output_format == "parquet":
+            return _write_parquet_chunks(chunks, output_csv)
+        total = 0
+        with open(output_csv, "w", newline="", encoding="utf-8") as fh:
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(fh, header=(i == 0), index=False)
+                total += len(chunk)
+        return total
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def _check_format(output_format: str) -> None:
+    """Valida el formato de salida."""
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"output_format must be one of {OUTPUT_FORMATS}, got {output_format!r}")
+
+
+def _write_parquet_chunks(chunks: Iterator[pd.DataFrame], output_path: str) -> int:
+    """Escribe cada bloque como un row group de un mismo archivo Parquet.
+
+    El esquema se fija con ``_parquet_schema`` a partir del primer bloque y los
+    siguientes se convierten a él.
+    """
+    writer, total = None, 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, _parquet_schema(table), compression="zstd")
+            writer.write_table(table.cast(writer.schema))
+            total += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+
+def _parquet_schema(table: pa.Table) -> pa.Schema:
+    """Esquema de salida que no depende de lo que traiga el primer bloque.
+
+    Las columnas de ``SCHEMA`` usan su tipo declarado; las categorías, un
+    diccionario de texto con índices int32, porque cada bloque trae sus propias
+    categorías. Las demás conservan el tipo inferido, salvo las que llegan
+    vacías en el bloque (el lector las infiere como null o float), que pasan a texto.
+    """
+    fields = []
+    for f, col in zip(table.schema, table.columns):
+        dtype = SCHEMA.get(f.name)
+        if dtype == "category":
+            f = f.with_type(pa.dictionary(pa.int32(), pa.string()))
+        elif dtype is not None:
+            f = f.with_type(pa.from_numpy_dtype(np.dtype(dtype)))
+        elif pa.types.is_null(f.type) or (len(col) and col.null_count == len(col)):
+            f = f.with_type(pa.string())
+        fields.append(f)
+    return pa.schema(fields, metadata=table.schema.metadata)
+
+
+def _score_into(
+    df: pd.DataFrame,
+    cfg: Dict[str, Any],
+    n_jobs: int,
+    with_reasons: bool,
+    pool: Optional[ProcessPoolExecutor] = None,
+) -> pd.DataFrame:
+    """Añade a ``df`` (en sitio) las columnas decision, risk_score y, si aplica, reasons."""
+    if with_reasons:
+        decision, score, reasons = assess_frame_parallel(df, cfg, n_jobs, pool)
+    else:
+        decision, score = score_frame(df, cfg)
+    df["decision"] = decision
+    df["risk_score"] = score.astype(RISK_SCORE_DTYPE)
+    if with_reasons:
+        df["reasons"] = reasons
+    return df
 
 
 # ==========================
@@ -213,9 +1037,26 @@ def run(input_csv: str, output_csv: str, config: Dict[str, Any] = None) -> pd.Da
 def main():  # pragma: no cover
     ap = argparse.ArgumentParser()
     ap.add_argument("--input", required=False, default="transactions_examples.csv", help="Path to input CSV")
-    ap.add_argument("--output", required=False, default="decisions.csv", help="Path to output CSV")
+    ap.add_argument("--output", required=False, default=None,
+                    help="Path to output file (default: decisions.<format>)")
+    ap.add_argument("--format", choices=OUTPUT_FORMATS, default="parquet", help="Output format")
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes for scoring (-1 = all CPUs)")
+    ap.add_argument("--no-reasons", action="store_true", help="Only write decision and risk_score (faster)")
+    ap.add_argument("--chunksize", type=int, default=None, help="Stream the CSV in blocks of this many rows")
+    ap.add_argument("--engine", choices=ENGINES, default="pandas", help="Batch engine (polars is optional)")
     args = ap.parse_args()
-    out = run(args.input, args.output)
+    output = args.output or f"decisions.{args.format}"
+    if args.engine == "polars":
+        run_polars(args.input, output, with_reasons=not args.no_reasons, output_format=args.format)
+        print(f"Decisions written to {output}")
+        return
+    if args.chunksize:
+        total = run_chunked(args.input, output, chunksize=args.chunksize, n_jobs=args.jobs,
+                            with_reasons=not args.no_reasons, output_format=args.format)
+        print(f"{total} transactions written to {output}")
+        return
+    out = run(args.input, output, n_jobs=args.jobs, with_reasons=not args.no_reasons,
+              output_format=args.format)
     print(out.head().to_string(index=False))
 
 
@@ -1,11 +1,30 @@
+import pathlib
+
 import pandas as pd
+import pytest
+
+import decision_engine
 from decision_engine import (
     assess_row,
+    assess_at,
+    assess_frame,
+    column_arrays,
+    compile_config,
+    run,
+    run_chunked,
+    score_frame,
     DEFAULT_CONFIG,
     DECISION_ACCEPTED,
     DECISION_REJECTED,
 )
 
+# CSV de ejemplo en la raíz del repositorio
+EXAMPLES_CSV = pathlib.Path(__file__).resolve().parents[1] / "transactions_examples.csv"
+
+# Celda en blanco tal como la entrega pandas al leer el CSV
+BLANK = float("nan")
+
+
 # --- Helper para crear una fila base ---
 def make_row(**kwargs):
     base = dict(
@@ -64,3 +83,354 @@ def test_low_risk_accept():
     row = make_row()
     result = assess_row(row, DEFAULT_CONFIG)
     assert result["decision"] == DECISION_ACCEPTED
+
+
+def test_assess_frame_matches_assess_row():
+    """La ruta vectorizada produce el mismo resultado que la evaluación fila a fila"""
+    df = pd.DataFrame([
+        make_row(),
+        make_row(chargeback_count=3, ip_risk="high"),
+        make_row(bin_country="US", ip_country="MX", hour=23),
+        make_row(amount_mxn=7000, product_type="physical", latency_ms=3000),
+        make_row(user_reputation="recurrent", customer_txn_30d=4, ip_risk="medium"),
+        make_row(user_reputation="trusted", email_risk="new_domain", device_fingerprint_risk="high"),
+        make_row(ip_risk=BLANK, bin_country=BLANK, hour=2),
+        make_row(product_type=BLANK, amount_mxn=9000, user_reputation=BLANK, ip_country=BLANK),
+        make_row(email_risk=BLANK, device_fingerprint_risk=BLANK, bin_country=BLANK, ip_country=BLANK),
+        make_row(chargeback_count=2, ip_risk="high", bin_country=BLANK),
+    ])
+    decision, score, reasons = assess_frame(df, DEFAULT_CONFIG)
+    for i, (_, row) in enumerate(df.iterrows()):
+        expected = assess_row(row, DEFAULT_CONFIG)
+        assert decision.iloc[i] == expected["decision"]
+        assert score.iloc[i] == expected["risk_score"]
+        assert reasons.iloc[i] == expected["reasons"]
+
+
+def test_run_writes_decisions(tmp_path):
+    """run lee el CSV de ejemplo y escribe decisión, score y razones por transacción"""
+    dst = tmp_path / "decisions.csv"
+    out = run(str(EXAMPLES_CSV), str(dst))
+    written = pd.read_csv(dst, keep_default_na=False)
+    assert len(written) == len(out) == len(pd.read_csv(EXAMPLES_CSV))
+    for (_, row), (_, res) in zip(pd.read_csv(EXAMPLES_CSV).iterrows(), written.iterrows()):
+        expected = assess_row(row, DEFAULT_CONFIG)
+        assert res["decision"] == expected["decision"]
+        assert res["risk_score"] == expected["risk_score"]
+        assert res["reasons"] == expected["reasons"]
+
+
+@pytest.mark.parametrize("python_kernel", [False, True])
+def test_score_frame_matches_assess_frame(monkeypatch, python_kernel):
+    """El kernel de score_frame (compilado o en Python puro) coincide con assess_frame"""
+    if python_kernel:
+        monkeypatch.setattr(decision_engine, "_score_kernel_jit", decision_engine._score_kernel)
+    else:
+        pytest.importorskip("numba")
+        assert decision_engine._score_kernel_jit is not None
+    df = decision_engine.read_transactions(str(EXAMPLES_CSV))
+    decision, score = score_frame(df, DEFAULT_CONFIG)
+    expected_decision, expected_score, _ = assess_frame(df, DEFAULT_CONFIG)
+    assert decision.tolist() == expected_decision.tolist()
+    assert score.tolist() == expected_score.tolist()
+
+
+def test_run_parallel_matches_serial(tmp_path):
+    """Repartir la evaluación entre procesos no cambia el resultado"""
+    serial = run(str(EXAMPLES_CSV), str(tmp_path / "serial.csv"))
+    parallel = run(str(EXAMPLES_CSV), str(tmp_path / "parallel.csv"), n_jobs=3)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_assess_frame_defaults_missing_columns():
+    """Las columnas ausentes toman los mismos valores por defecto que assess_row"""
+    row = make_row(latency_ms=3000, hour=23).drop(["latency_ms", "bin_country", "product_type"])
+    df = pd.DataFrame([row])
+    decision, score, reasons = assess_frame(df, DEFAULT_CONFIG)
+    expected = assess_row(row, DEFAULT_CONFIG)
+    assert decision.iloc[0] == expected["decision"]
+    assert score.iloc[0] == expected["risk_score"]
+    assert reasons.iloc[0] == expected["reasons"]
+    assert "latency_ms" not in df.columns
+
+
+def test_run_keeps_unknown_columns(tmp_path):
+    """Las columnas que el motor no usa se copian tal cual al archivo de salida"""
+    df = pd.read_csv(EXAMPLES_CSV)
+    df.insert(1, "merchant", "shop-" + df["transaction_id"].astype(str))
+    df.to_csv(tmp_path / "in.csv", index=False)
+    run(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"))
+    written = pd.read_csv(tmp_path / "out.csv")
+    assert list(written.columns) == list(df.columns) + ["decision", "risk_score", "reasons"]
+    assert written["merchant"].tolist() == df["merchant"].tolist()
+
+
+def test_run_header_only_csv(tmp_path):
+    """Un CSV sin filas produce un archivo de salida vacío con las columnas de resultado"""
+    (tmp_path / "in.csv").write_text(EXAMPLES_CSV.read_text(encoding="utf-8").splitlines()[0] + "\n", encoding="utf-8")
+    out = run(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"))
+    assert out.empty
+    assert list(out.columns)[-3:] == ["decision", "risk_score", "reasons"]
+
+
+def test_run_blank_country_column(tmp_path):
+    """Una columna de país completamente vacía se compara como "NAN", igual que assess_row"""
+    df = pd.read_csv(EXAMPLES_CSV)
+    df["bin_country"] = None
+    df.to_csv(tmp_path / "in.csv", index=False)
+    out = run(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"))
+    assert len(out) == len(df)
+    for (_, row), reasons in zip(pd.read_csv(tmp_path / "in.csv").iterrows(), out["reasons"]):
+        assert reasons == assess_row(row, DEFAULT_CONFIG)["reasons"]
+    assert out["reasons"].str.contains("geo_mismatch:NAN!=").any()
+
+
+def test_blank_country_same_on_every_path(tmp_path):
+    """Un país en blanco da el mismo resultado fila a fila, por posición y vectorizado"""
+    rows = [
+        make_row(bin_country=None, ip_country="MX"),
+        make_row(bin_country="US", ip_country=None),
+        make_row(bin_country=None, ip_country=None),
+        make_row(bin_country="MX", ip_country="MX"),
+    ]
+    pd.DataFrame(rows).to_csv(tmp_path / "in.csv", index=False)
+    df = decision_engine.read_transactions(str(tmp_path / "in.csv"))
+    cols = column_arrays(df)
+    decision, score, reasons = assess_frame(df, DEFAULT_CONFIG)
+    for i, row in enumerate(rows):
+        expected = assess_row(row, DEFAULT_CONFIG)
+        assert assess_at(cols, i, DEFAULT_CONFIG) == expected
+        assert (decision.iloc[i], score.iloc[i], reasons.iloc[i]) == (
+            expected["decision"], expected["risk_score"], expected["reasons"]
+        )
+    assert score.tolist() == [2, 2, 0, 0]
+
+
+def test_run_without_reasons(tmp_path):
+    """with_reasons=False escribe sólo decisión y score, iguales a la ruta completa"""
+    full = run(str(EXAMPLES_CSV), str(tmp_path / "full.csv"))
+    fast = run(str(EXAMPLES_CSV), str(tmp_path / "fast.csv"), with_reasons=False)
+    assert "reasons" not in pd.read_csv(tmp_path / "fast.csv").columns
+    assert fast["decision"].tolist() == full["decision"].tolist()
+    assert fast["risk_score"].tolist() == full["risk_score"].tolist()
+
+
+def test_assess_row_accepts_compiled_config():
+    """assess_row da el mismo resultado con el dict de configuración o con CompiledConfig"""
+    compiled = compile_config(DEFAULT_CONFIG)
+    for row in [make_row(), make_row(hour=2, amount_mxn=9000, latency_ms=2600), make_row(chargeback_count=2, ip_risk="high")]:
+        assert assess_row(row, compiled) == assess_row(row, DEFAULT_CONFIG)
+
+
+def test_assess_at_matches_assess_frame():
+    """La ruta fila a fila por posición coincide con la vectorizada"""
+    df = decision_engine.read_transactions(str(EXAMPLES_CSV))
+    cols = column_arrays(df)
+    decision, score, reasons = assess_frame(df, DEFAULT_CONFIG)
+    for i in range(len(df)):
+        res = assess_at(cols, i, DEFAULT_CONFIG)
+        assert (res["decision"], res["risk_score"], res["reasons"]) == (decision.iloc[i], score.iloc[i], reasons.iloc[i])
+
+
+@pytest.mark.parametrize("reject_at,review_at", [(10, 4), (4, 4), (3, 6)])
+def test_assess_frame_decision_cutoffs(reject_at, review_at):
+    """Los cortes vectorizados reproducen _get_decision, también con umbrales invertidos"""
+    cfg = {**DEFAULT_CONFIG, "score_to_decision": {"reject_at": reject_at, "review_at": review_at}}
+    rows = [
+        make_row(),
+        make_row(ip_risk="medium", email_risk="medium", hour=23),
+        make_row(ip_risk="high", email_risk="high", device_fingerprint_risk="high"),
+        make_row(user_reputation="trusted"),
+    ]
+    decision, _, _ = assess_frame(pd.DataFrame(rows), cfg)
+    assert decision.tolist() == [assess_row(r, cfg)["decision"] for r in rows]
+
+
+@pytest.mark.parametrize("with_reasons", [True, False])
+def test_run_chunked_matches_run(tmp_path, with_reasons):
+    """Procesar por bloques produce el mismo archivo que run"""
+    run(str(EXAMPLES_CSV), str(tmp_path / "full.csv"), with_reasons=with_reasons)
+    total = run_chunked(str(EXAMPLES_CSV), str(tmp_path / "chunked.csv"), chunksize=4, with_reasons=with_reasons)
+    assert total == len(pd.read_csv(EXAMPLES_CSV))
+    assert (tmp_path / "chunked.csv").read_text(encoding="utf-8") == (tmp_path / "full.csv").read_text(encoding="utf-8")
+
+
+def test_run_parquet_output(tmp_path):
+    """La salida Parquet (completa o por bloques) contiene los mismos resultados que la CSV"""
+    expected = run(str(EXAMPLES_CSV), str(tmp_path / "out.csv"))
+    run(str(EXAMPLES_CSV), str(tmp_path / "out.parquet"), output_format="parquet")
+    run_chunked(str(EXAMPLES_CSV), str(tmp_path / "chunked.parquet"), chunksize=4, output_format="parquet")
+    for name in ["out.parquet", "chunked.parquet"]:
+        written = pd.read_parquet(tmp_path / name)
+        assert isinstance(written["ip_risk"].dtype, pd.CategoricalDtype)
+        for col in ["decision", "risk_score", "reasons"]:
+            assert written[col].tolist() == expected[col].tolist()
+
+
+def test_run_rejects_unknown_format(tmp_path):
+    """Un formato de salida desconocido se rechaza antes de leer la entrada"""
+    with pytest.raises(ValueError):
+        run("missing.csv", str(tmp_path / "out.json"), output_format="json")
+
+
+def test_assess_frame_normalizes_mixed_case_categories():
+    """Categorías que sólo difieren en mayúsculas se unifican antes de evaluar"""
+    rows = [
+        make_row(ip_risk="High", chargeback_count=2, bin_country="mx"),
+        make_row(ip_risk="high", email_risk="MEDIUM", bin_country="US", ip_country="us"),
+        make_row(ip_risk="Medium", user_reputation="Trusted", product_type="Physical", amount_mxn=7000),
+    ]
+    df = pd.DataFrame(rows)
+    df["ip_risk"] = df["ip_risk"].astype("category")
+    decision, score, reasons = assess_frame(df, DEFAULT_CONFIG)
+    for i, row in enumerate(rows):
+        expected = assess_row(row, DEFAULT_CONFIG)
+        assert (decision.iloc[i], score.iloc[i], reasons.iloc[i]) == (
+            expected["decision"], expected["risk_score"], expected["reasons"]
+        )
+    assert df["ip_risk"].tolist() == ["High", "high", "Medium"]
+
+
+def test_run_polars_matches_run(tmp_path):
+    """La ruta Polars produce las mismas decisiones, scores y razones que run"""
+    pytest.importorskip("polars")
+    run(str(EXAMPLES_CSV), str(tmp_path / "pandas.csv"))
+    decision_engine.run_polars(str(EXAMPLES_CSV), str(tmp_path / "polars.csv"))
+    expected = pd.read_csv(tmp_path / "pandas.csv", keep_default_na=False)
+    written = pd.read_csv(tmp_path / "polars.csv", keep_default_na=False)
+    assert list(written.columns) == list(expected.columns)
+    for col in ["decision", "risk_score", "reasons"]:
+        assert written[col].tolist() == expected[col].tolist()
+
+
+def test_run_polars_header_only_and_blank_columns(tmp_path):
+    """La ruta Polars coincide con run en un CSV sin filas y con columnas en blanco"""
+    pytest.importorskip("polars")
+    (tmp_path / "header.csv").write_text(EXAMPLES_CSV.read_text(encoding="utf-8").splitlines()[0] + "\n", encoding="utf-8")
+    decision_engine.run_polars(str(tmp_path / "header.csv"), str(tmp_path / "header_out.csv"))
+    assert pd.read_csv(tmp_path / "header_out.csv").empty
+    df = pd.read_csv(EXAMPLES_CSV)
+    df[["bin_country", "ip_risk", "product_type"]] = None
+    df.to_csv(tmp_path / "blank.csv", index=False)
+    run(str(tmp_path / "blank.csv"), str(tmp_path / "pandas.csv"))
+    decision_engine.run_polars(str(tmp_path / "blank.csv"), str(tmp_path / "polars.csv"))
+    expected = pd.read_csv(tmp_path / "pandas.csv", keep_default_na=False)
+    written = pd.read_csv(tmp_path / "polars.csv", keep_default_na=False)
+    for col in ["decision", "risk_score", "reasons"]:
+        assert written[col].tolist() == expected[col].tolist()
+
+
+def test_env_overrides(monkeypatch):
+    """REJECT_AT / REVIEW_AT sobrescriben los umbrales y un valor inválido falla"""
+    cfg = {"score_to_decision": {"reject_at": 10, "review_at": 4}}
+    monkeypatch.setenv("REJECT_AT", "12")
+    monkeypatch.delenv("REVIEW_AT", raising=False)
+    assert decision_engine._apply_env_overrides(cfg)["score_to_decision"] == {"reject_at": 12, "review_at": 4}
+    monkeypatch.setenv("REVIEW_AT", "high")
+    with pytest.raises(ValueError):
+        decision_engine._apply_env_overrides(cfg)
+
+
+def test_assess_frame_large_weights_do_not_overflow():
+    """Con pesos que no caben en int8 el score se acumula en int16"""
+    weights = {**DEFAULT_CONFIG["score_weights"], "ip_risk": {"low": 0, "medium": 2, "high": 120}}
+    cfg = {**DEFAULT_CONFIG, "score_weights": weights}
+    row = make_row(ip_risk="high", hour=23, bin_country="US")
+    _, score, _ = assess_frame(pd.DataFrame([row]), cfg)
+    assert score.iloc[0] == assess_row(row, cfg)["risk_score"] == 123
+
+
+def test_assess_frame_reasons_with_repeated_values():
+    """Las razones formateadas una vez por valor distinto coinciden con las de cada fila"""
+    rows = [
+        make_row(bin_country="US", ip_country="MX", hour=2, latency_ms=3000),
+        make_row(bin_country="MX", ip_country="US", hour=2, latency_ms=3000),
+        make_row(bin_country="US", ip_country="MX", hour=23, amount_mxn=7000, product_type="physical"),
+        make_row(bin_country="", ip_country="CO", hour=-1, amount_mxn=7000, product_type="physical"),
+        make_row(bin_country="CO", ip_country="CO", hour=23, latency_ms=2500),
+    ]
+    decision, score, reasons = assess_frame(pd.DataFrame(rows), DEFAULT_CONFIG)
+    for i, row in enumerate(rows):
+        expected = assess_row(row, DEFAULT_CONFIG)
+        assert (decision.iloc[i], score.iloc[i], reasons.iloc[i]) == (
+            expected["decision"], expected["risk_score"], expected["reasons"]
+        )
+
+
+def test_run_keeps_large_integers_and_blank_ids(tmp_path):
+    """Enteros fuera del rango estrecho no dan la vuelta y un transaction_id en blanco se admite"""
+    rows = [
+        make_row(latency_ms=3_000_000_000, customer_txn_30d=40_000, user_reputation="trusted", ip_risk="medium"),
+        make_row(),
+    ]
+    df = pd.DataFrame(rows)
+    df.insert(0, "transaction_id", [1, None])
+    df.to_csv(tmp_path / "in.csv", index=False)
+    for dst, writer in [("run.csv", run), ("chunked.csv", run_chunked)]:
+        writer(str(tmp_path / "in.csv"), str(tmp_path / dst))
+        written = pd.read_csv(tmp_path / dst)
+        assert written["latency_ms"].tolist() == [3_000_000_000, 10]
+        assert written["customer_txn_30d"].tolist() == [40_000, 0]
+        assert written["transaction_id"].isna().tolist() == [False, True]
+        assert written["reasons"].iloc[0] == assess_row(rows[0], DEFAULT_CONFIG)["reasons"]
+    assert "latency_extreme:3000000000ms" in written["reasons"].iloc[0]
+    assert "frequency_buffer(-1)" in written["reasons"].iloc[0]
+
+
+def test_run_out_of_range_hour_is_not_truncated(tmp_path):
+    """Una hora que no cabe en int8 conserva su valor en las reglas y en la salida"""
+    rows = [make_row(hour=200), make_row(hour=23)]
+    pd.DataFrame(rows).to_csv(tmp_path / "in.csv", index=False)
+    out = run(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"))
+    assert pd.read_csv(tmp_path / "out.csv")["hour"].tolist() == [200, 23]
+    assert out["reasons"].tolist() == [assess_row(r, DEFAULT_CONFIG)["reasons"] for r in rows]
+    assert "night_hour:200(+1)" in out["reasons"].iloc[0]
+    assert decision_engine.read_transactions(str(tmp_path / "out.csv"))["hour"].dtype == "int64"
+
+
+def test_run_chunked_parquet_with_blank_first_chunk(tmp_path):
+    """El esquema Parquet no depende de que el primer bloque traiga columnas en blanco"""
+    rows = [make_row(), make_row(), make_row(hour=23), make_row(bin_country="US")]
+    df = pd.DataFrame(rows)
+    df.insert(0, "transaction_id", [1, 2, None, 4])
+    df["geo_state"] = [None, None, "Jalisco", "CDMX"]
+    df["merchant"] = [None, None, "shop", "shop"]
+    df.to_csv(tmp_path / "in.csv", index=False)
+    run(str(tmp_path / "in.csv"), str(tmp_path / "full.parquet"), output_format="parquet")
+    total = run_chunked(str(tmp_path / "in.csv"), str(tmp_path / "chunked.parquet"), chunksize=2, output_format="parquet")
+    assert total == len(rows)
+    full = pd.read_parquet(tmp_path / "full.parquet")
+    chunked = pd.read_parquet(tmp_path / "chunked.parquet")
+    pd.testing.assert_frame_equal(chunked, full)
+    assert chunked["geo_state"].tolist()[2:] == ["Jalisco", "CDMX"]
+    assert chunked["merchant"].tolist()[2:] == ["shop", "shop"]
+
+
+def test_run_chunked_reuses_process_pool(tmp_path, monkeypatch):
+    """Con n_jobs > 1 run_chunked arranca un único pool de procesos para todos los bloques"""
+    created = []
+
+    class CountingPool(decision_engine.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            created.append(kwargs.get("max_workers"))
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(decision_engine, "ProcessPoolExecutor", CountingPool)
+    run(str(EXAMPLES_CSV), str(tmp_path / "serial.csv"))
+    run_chunked(str(EXAMPLES_CSV), str(tmp_path / "chunked.csv"), chunksize=4, n_jobs=2)
+    assert created == [2]
+    assert (tmp_path / "chunked.csv").read_text(encoding="utf-8") == (tmp_path / "serial.csv").read_text(encoding="utf-8")
+
+
+def test_risk_score_dtype_is_the_same_on_every_path(tmp_path):
+    """risk_score se escribe con el mismo tipo con o sin razones, por bloques y con Polars"""
+    outputs = {
+        "run": lambda dst: run(str(EXAMPLES_CSV), dst, output_format="parquet"),
+        "fast": lambda dst: run(str(EXAMPLES_CSV), dst, with_reasons=False, output_format="parquet"),
+        "chunked": lambda dst: run_chunked(str(EXAMPLES_CSV), dst, chunksize=4, output_format="parquet"),
+    }
+    if decision_engine.pl is not None:
+        outputs["polars"] = lambda dst: decision_engine.run_polars(str(EXAMPLES_CSV), dst, output_format="parquet")
+    for name, write in outputs.items():
+        write(str(tmp_path / f"{name}.parquet"))
+        assert pd.read_parquet(tmp_path / f"{name}.parquet")["risk_score"].dtype == decision_engine.RISK_SCORE_DTYPE, name